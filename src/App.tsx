@@ -1,4 +1,4 @@
-import { useState, useCallback, useEffect } from 'react';
+import { useState, useCallback, useEffect, useMemo } from 'react';
 import { MathGrapher } from './components/MathGrapher';
 import { FloatingControls } from './components/FloatingControls';
 import { AnalysisPanel } from './components/AnalysisPanel';
@@ -41,7 +41,6 @@ function App() {
     showGrid: true
   });
 
-  const [analysisData, setAnalysisData] = useState<AnalysisData | null>(null);
   const [showAnalysis, setShowAnalysis] = useState(false);
   const [showExamples, setShowExamples] = useState(false);
   const [parsedExpression, setParsedExpression] = useState<any>(null);
@@ -57,16 +56,21 @@ function App() {
       const parsed = parseMathExpression(equation);
       setParsedExpression(parsed);
       updateConfig({ equation });
-      
-      // Perform analysis
-      const analysis = analyzeExpression(parsed, config.xMin, config.xMax, config.yMin, config.yMax);
-      setAnalysisData(analysis);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Invalid equation');
       setParsedExpression(null);
-      setAnalysisData(null);
     }
-  }, [config.xMin, config.xMax, config.yMin, config.yMax, updateConfig]);
+  }, [updateConfig]);
+
+  // Analysis is only computed while something displays it, and is
+  // recomputed when the domain changes rather than on every keystroke
+  const needsAnalysis = showAnalysis || config.showCriticalPoints;
+  const analysisData = useMemo<AnalysisData | null>(() => {
+    if (!parsedExpression || !needsAnalysis) {
+      return null;
+    }
+    return analyzeExpression(parsedExpression, config.xMin, config.xMax, config.yMin, config.yMax);
+  }, [parsedExpression, needsAnalysis, config.xMin, config.xMax, config.yMin, config.yMax]);
 
   const handleExampleSelect = useCallback((equation: string) => {
     handleEquationChange(equation);
@@ -1,7 +1,27 @@
-import { useEffect, useRef, useState } from 'react';
+import { useEffect, useMemo, useRef, useState } from 'react';
 import * as Plotly from 'plotly.js-dist';
 import { GraphConfig, AnalysisData } from '../App';
 import { ParsedExpression, createMeshData } from '../utils/mathParser';
+import { createLogger } from '../utils/logger';
+
+const log = createLogger('MathGrapher');
+
+// Shared by all three scene axes. The scene is already black, so the
+// axis background walls are not drawn at all
+const AXIS_STYLE = {
+  gridcolor: '#333333',
+  zerolinecolor: '#666666',
+  color: '#ffffff'
+};
+
+const PLOT_CONFIG = {
+  displayModeBar: true,
+  modeBarButtonsToRemove: ['pan2d', 'select2d', 'lasso2d', 'autoScale2d'],
+  modeBarButtonsToAdd: ['hoverClosestCartesian', 'toggleSpikelines'],
+  displaylogo: false,
+  responsive: true,
+  scrollZoom: true
+};
 
 interface MathGrapherProps {
   config: GraphConfig;
@@ -17,23 +37,30 @@ export const MathGrapher = ({
   const plotRef = useRef<HTMLDivElement>(null);
   const [isInitialized, setIsInitialized] = useState(false);
 
+  // Only re-evaluate the surface when the expression or sampling changes,
+  // not when display options are toggled
+  const meshData = useMemo(() => {
+    if (!parsedExpression || !parsedExpression.isValid) {
+      return null;
+    }
+
+    return createMeshData(
+      parsedExpression,
+      config.xMin,
+      config.xMax,
+      config.yMin,
+      config.yMax,
+      config.resolution
+    );
+  }, [parsedExpression, config.xMin, config.xMax, config.yMin, config.yMax, config.resolution]);
+
   useEffect(() => {
-    if (!plotRef.current || !parsedExpression || !parsedExpression.isValid) {
+    if (!plotRef.current || !meshData) {
       return;
     }
 
     const createPlot = async () => {
       try {
-        // Generate mesh data
-        const meshData = createMeshData(
-          parsedExpression,
-          config.xMin,
-          config.xMax,
-          config.yMin,
-          config.yMax,
-          config.resolution
-        );
-
         const traces: any[] = [];
 
         // Main surface/plot trace
@@ -70,6 +97,8 @@ export const MathGrapher = ({
             }
           });
         } else if (config.graphType === 'wireframe') {
+          // Flat colour: every row can reference the same zero row
+          const zeroRow = new Float32Array(meshData.x.length);
           traces.push({
             type: 'surface',
             x: meshData.x,
@@ -77,7 +106,7 @@ export const MathGrapher = ({
             z: meshData.z,
             colorscale: [[0, '#ffffff'], [1, '#ffffff']],
             showscale: false,
-            surfacecolor: meshData.z.map(row => row.map(() => 0)),
+            surfacecolor: meshData.z.map(() => zeroRow),
             name: 'Wireframe',
             opacity: 1,
             contours: {
@@ -89,8 +118,8 @@ export const MathGrapher = ({
         } else if (config.graphType === 'contour') {
           traces.push({
             type: 'contour',
-            x: meshData.x[0],
-            y: meshData.y.map(row => row[0]),
+            x: meshData.x,
+            y: meshData.y,
             z: meshData.z,
             colorscale: 'Greys',
             showscale: true,
@@ -117,20 +146,33 @@ export const MathGrapher = ({
               unknown: '#ffffff'
             };
 
-            criticalPoints.forEach((point) => {
+            // One marker trace per point type, filled in a single pass
+            const groups = new Map<string, { x: number[]; y: number[]; z: number[]; text: string[] }>();
+            for (const point of criticalPoints) {
+              let group = groups.get(point.type);
+              if (!group) {
+                group = { x: [], y: [], z: [], text: [] };
+                groups.set(point.type, group);
+              }
+              group.x.push(point.x);
+              group.y.push(point.y);
+              group.z.push(point.z);
+              group.text.push(`${point.type} (${point.x.toFixed(2)}, ${point.y.toFixed(2)})`);
+            }
+
+            groups.forEach((group, type) => {
               traces.push({
                 type: 'scatter3d',
-                x: [point.x],
-                y: [point.y],
-                z: [point.z],
+                ...group,
                 mode: 'markers',
+                hoverinfo: 'text+z',
                 marker: {
                   size: 8,
-                  color: colors[point.type],
+                  color: colors[type as keyof typeof colors],
                   symbol: 'diamond',
                   line: { color: '#000000', width: 2 }
                 },
-                name: `${point.type} (${point.x.toFixed(2)}, ${point.y.toFixed(2)})`,
+                name: `${type} (${group.x.length})`,
                 showlegend: true
               });
             });
@@ -144,30 +186,9 @@ export const MathGrapher = ({
           margin: { l: 0, r: 0, t: 0, b: 0 },
           scene: {
             bgcolor: '#000000',
-            xaxis: {
-              backgroundcolor: '#000000',
-              gridcolor: '#333333',
-              showbackground: true,
-              zerolinecolor: '#666666',
-              color: '#ffffff',
-              title: { text: 'x', font: { color: '#ffffff' } }
-            },
-            yaxis: {
-              backgroundcolor: '#000000',
-              gridcolor: '#333333',
-              showbackground: true,
-              zerolinecolor: '#666666',
-              color: '#ffffff',
-              title: { text: 'y', font: { color: '#ffffff' } }
-            },
-            zaxis: {
-              backgroundcolor: '#000000',
-              gridcolor: '#333333',
-              showbackground: true,
-              zerolinecolor: '#666666',
-              color: '#ffffff',
-              title: { text: 'z', font: { color: '#ffffff' } }
-            },
+            xaxis: { ...AXIS_STYLE, title: { text: 'x' } },
+            yaxis: { ...AXIS_STYLE, title: { text: 'y' } },
+            zaxis: { ...AXIS_STYLE, title: { text: 'z' } },
             camera: {
               eye: { x: 1.5, y: 1.5, z: 1.5 }
             }
@@ -181,20 +202,11 @@ export const MathGrapher = ({
           }
         };
 
-        const plotConfig = {
-          displayModeBar: true,
-          modeBarButtonsToRemove: ['pan2d', 'select2d', 'lasso2d', 'autoScale2d'],
-          modeBarButtonsToAdd: ['hoverClosestCartesian', 'toggleSpikelines'],
-          displaylogo: false,
-          responsive: true,
-          scrollZoom: true
-        };
-
         if (!isInitialized) {
-          await Plotly.newPlot(plotRef.current, traces, layout, plotConfig);
+          await Plotly.newPlot(plotRef.current, traces, layout, PLOT_CONFIG);
           setIsInitialized(true);
         } else {
-          await Plotly.react(plotRef.current, traces, layout, plotConfig);
+          await Plotly.react(plotRef.current, traces, layout, PLOT_CONFIG);
         }
 
         // Make the plot extremely zoomable
@@ -215,12 +227,12 @@ export const MathGrapher = ({
         }
 
       } catch (error) {
-        console.error('Plot creation error:', error);
+        log.error('Plot creation error:', error);
       }
     };
 
     createPlot();
-  }, [config, parsedExpression, analysisData, isInitialized]);
+  }, [config, meshData, analysisData, isInitialized]);
 
   // Handle window resize
   useEffect(() => {
@@ -1,3 +1,5 @@
+/// <reference types="vite/client" />
+
 declare module 'plotly.js-dist' {
   const Plotly: any;
   export = Plotly;
@@ -0,0 +1,73 @@
+import { EvalFunction, isFunctionNode, isOperatorNode, MathNode, parse } from 'mathjs';
+
+// Evaluates several expressions at one point, returning one value per expression
+export type SharedEvaluator = (scope: Record<string, number>) => any[];
+
+// Compile a group of expressions with common subexpression elimination:
+// every operator/function subtree that occurs more than once across the
+// group is evaluated a single time per call and reused through a temporary
+export function compileShared(nodes: MathNode[]): SharedEvaluator {
+  const { shared, representatives } = findSharedSubtrees(nodes);
+
+  const names = new Map<string, string>();
+  shared.forEach((key, index) => names.set(key, `_cse${index}`));
+
+  const substitute = (node: MathNode, exclude?: string) =>
+    node.transform((child) => {
+      if (isOperatorNode(child) || isFunctionNode(child)) {
+        const key = child.toString();
+        const name = names.get(key);
+        if (name && key !== exclude) return parse(name);
+      }
+      return child;
+    });
+
+  const temporaries: [string, EvalFunction][] = shared.map(key => [
+    names.get(key) as string,
+    substitute(representatives.get(key) as MathNode, key).compile()
+  ]);
+  const outputs = nodes.map(node => substitute(node).compile());
+
+  return (scope) => {
+    const local: Record<string, unknown> = { ...scope };
+    for (const [name, compiled] of temporaries) {
+      local[name] = compiled.evaluate(local);
+    }
+    return outputs.map(compiled => compiled.evaluate(local));
+  };
+}
+
+// Single-expression form: repeated subtrees within the expression are
+// folded into temporaries, otherwise this is a plain compile
+export function compileWithCse(node: MathNode): EvalFunction {
+  if (findSharedSubtrees([node]).shared.length === 0) {
+    return node.compile();
+  }
+
+  const evaluator = compileShared([node]);
+  return { evaluate: (scope?: Record<string, number>) => evaluator(scope ?? {})[0] };
+}
+
+function findSharedSubtrees(nodes: MathNode[]) {
+  const counts = new Map<string, number>();
+  const representatives = new Map<string, MathNode>();
+
+  for (const node of nodes) {
+    node.traverse((child) => {
+      if (isOperatorNode(child) || isFunctionNode(child)) {
+        const key = child.toString();
+        counts.set(key, (counts.get(key) ?? 0) + 1);
+        if (!representatives.has(key)) representatives.set(key, child);
+      }
+    });
+  }
+
+  // Shorter keys are subtrees of longer ones, so evaluating temporaries in
+  // ascending length order guarantees their dependencies are ready
+  const shared = Array.from(counts)
+    .filter(([, count]) => count > 1)
+    .map(([key]) => key)
+    .sort((a, b) => a.length - b.length);
+
+  return { shared, representatives };
+}
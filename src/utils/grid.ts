@@ -0,0 +1,41 @@
+import { LruCache } from './lruCache';
+
+export interface GridAxes {
+  x: readonly number[];
+  y: readonly number[];
+}
+
+// Axes shared by every consumer sampling the same domain; switching graph
+// types or toggling analysis reuses them instead of rebuilding
+const axesCache = new LruCache<string, GridAxes>(32);
+
+// Evenly spaced sample coordinates from min to max inclusive
+export function linspace(min: number, max: number, count: number): number[] {
+  const step = (max - min) / (count - 1);
+  const values: number[] = [];
+
+  for (let i = 0; i < count; i++) {
+    values[i] = min + i * step;
+  }
+
+  return values;
+}
+
+export function gridAxes(
+  xMin: number,
+  xMax: number,
+  yMin: number,
+  yMax: number,
+  resolution: number
+): GridAxes {
+  const key = [xMin, xMax, yMin, yMax, resolution].join('|');
+  const cached = axesCache.get(key);
+  if (cached) return cached;
+
+  const axes = {
+    x: linspace(xMin, xMax, resolution),
+    y: linspace(yMin, yMax, resolution)
+  };
+  axesCache.set(key, axes);
+  return axes;
+}
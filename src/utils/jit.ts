@@ -0,0 +1,96 @@
+import { isConstantNode, isFunctionNode, isOperatorNode, isParenthesisNode, isSymbolNode, MathNode } from 'mathjs';
+import { LruCache } from './lruCache';
+
+// Plain JavaScript surface kernel: no scope object, no mathjs dispatch
+export type SurfaceKernel = (x: number, y: number) => number;
+
+// Maps rather than object literals so user identifiers can never reach
+// prototype properties
+const OPERATORS = new Map([
+  ['add', '+'],
+  ['subtract', '-'],
+  ['multiply', '*'],
+  ['divide', '/']
+]);
+
+const FUNCTIONS = new Map([
+  'sin', 'cos', 'tan', 'asin', 'acos', 'atan', 'atan2',
+  'sinh', 'cosh', 'tanh', 'exp', 'sqrt', 'cbrt', 'abs',
+  'log10', 'log2', 'floor', 'ceil', 'sign'
+].map((name): [string, string] => [name, `Math.${name}`]));
+
+const SYMBOLS = new Map([
+  ['x', 'x'],
+  ['y', 'y'],
+  ['pi', 'Math.PI'],
+  ['e', 'Math.E']
+]);
+
+const kernelCache = new LruCache<string, SurfaceKernel | null>(256);
+
+// Translate an expression into a native function of (x, y). Returns null
+// when the expression uses anything outside the supported real-valued
+// subset, in which case callers fall back to the mathjs evaluator
+export function compileSurfaceKernel(node: MathNode, key = node.toString()): SurfaceKernel | null {
+  const cached = kernelCache.get(key);
+  if (cached !== undefined) return cached;
+
+  let kernel: SurfaceKernel | null = null;
+  try {
+    const source = emit(node);
+    kernel = source === null
+      ? null
+      : new Function('x', 'y', `return ${source};`) as SurfaceKernel;
+  } catch (error) {
+    // Code generation unavailable (e.g. a content security policy)
+  }
+
+  kernelCache.set(key, kernel);
+  return kernel;
+}
+
+function emit(node: MathNode): string | null {
+  if (isParenthesisNode(node)) {
+    return emit(node.content);
+  }
+
+  if (isConstantNode(node)) {
+    return typeof node.value === 'number' && isFinite(node.value) ? `(${node.value})` : null;
+  }
+
+  if (isSymbolNode(node)) {
+    return SYMBOLS.get(node.name) ?? null;
+  }
+
+  const args: string[] = [];
+  if (isOperatorNode(node) || isFunctionNode(node)) {
+    for (const arg of node.args) {
+      const source = emit(arg);
+      if (source === null) return null;
+      args.push(source);
+    }
+  }
+
+  if (isOperatorNode(node)) {
+    if (node.fn === 'unaryMinus') return `(-${args[0]})`;
+    if (node.fn === 'unaryPlus') return args[0];
+    if (node.fn === 'pow') return `Math.pow(${args[0]}, ${args[1]})`;
+
+    const operator = OPERATORS.get(node.fn);
+    return operator && args.length >= 2 ? `(${args.join(` ${operator} `)})` : null;
+  }
+
+  if (isFunctionNode(node)) {
+    const name = node.fn.name;
+    if (name === 'log') {
+      if (args.length === 1) return `Math.log(${args[0]})`;
+      if (args.length === 2) return `(Math.log(${args[0]}) / Math.log(${args[1]}))`;
+      return null;
+    }
+
+    const fn = FUNCTIONS.get(name);
+    return fn ? `${fn}(${args.join(', ')})` : null;
+  }
+
+  return null;
+}
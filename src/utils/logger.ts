@@ -0,0 +1,31 @@
+export type LogLevel = 'debug' | 'warn' | 'error' | 'silent';
+
+const LEVELS: Record<LogLevel, number> = {
+  debug: 10,
+  warn: 20,
+  error: 30,
+  silent: 40
+};
+
+// Development builds show the debug diagnostics from the analysis paths
+const threshold = LEVELS[import.meta.env.DEV ? 'debug' : 'warn'];
+
+export interface Logger {
+  debug: (message: string, ...details: unknown[]) => void;
+  warn: (message: string, ...details: unknown[]) => void;
+  error: (message: string, ...details: unknown[]) => void;
+}
+
+// Messages below the threshold return before any formatting or console I/O
+export function createLogger(scope: string): Logger {
+  const emit = (level: Exclude<LogLevel, 'silent'>, message: string, details: unknown[]) => {
+    if (LEVELS[level] < threshold) return;
+    console[level](`[${scope}] ${message}`, ...details);
+  };
+
+  return {
+    debug: (message, ...details) => emit('debug', message, details),
+    warn: (message, ...details) => emit('warn', message, details),
+    error: (message, ...details) => emit('error', message, details)
+  };
+}
@@ -1,5 +1,23 @@
-import { derivative, parse } from 'mathjs';
-import { ParsedExpression, evaluateExpression } from './mathParser';
+import {
+  derivative,
+  EvalFunction,
+  isFunctionNode,
+  isOperatorNode,
+  isSymbolNode,
+  MathNode
+} from 'mathjs';
+import { compileExpression, ParsedExpression } from './mathParser';
+import { compileShared, SharedEvaluator } from './cse';
+import { gridAxes } from './grid';
+import { createLogger } from './logger';
+import { LruCache } from './lruCache';
+import {
+  Polynomial,
+  polynomialTerms,
+  realPolynomialRoots,
+  toPolynomial,
+  univariateCoefficients
+} from './polynomial';
 
 export interface DerivativeData {
   fx?: string;
@@ -9,6 +27,26 @@ export interface DerivativeData {
   fxy?: string;
 }
 
+interface DerivativeBundle {
+  fx?: MathNode;
+  fy?: MathNode;
+  fxx?: MathNode;
+  fyy?: MathNode;
+  fxy?: MathNode;
+  // Printed once; used both for display and as compile cache keys
+  text: DerivativeData;
+  // Compiled once so numeric consumers never re-walk the node trees
+  compiled: Partial<Record<'f' | 'fx' | 'fy' | 'fxx' | 'fyy' | 'fxy', EvalFunction>>;
+  // [fx, fy, fxx, fyy, fxy] at a point, sharing common subexpressions
+  derivativesAt?: SharedEvaluator;
+  // |grad f| evaluated numerically; never built as a symbolic sqrt
+  gradientMagnitude?: (x: number, y: number) => number;
+  // [fxx, fyy, fxy] when none of them depend on x or y
+  constantHessian?: Hessian;
+  // Expanded form in ['x', 'y'] when the expression is a polynomial
+  polynomial?: Polynomial;
+}
+
 export interface CriticalPoint {
   x: number;
   y: number;
@@ -16,6 +54,12 @@ export interface CriticalPoint {
   type: 'minimum' | 'maximum' | 'saddle' | 'unknown';
 }
 
+type Hessian = [fxx: number, fyy: number, fxy: number];
+
+// Candidates may carry the Hessian from their last Newton step so
+// classification does not have to evaluate it again
+type CandidatePoint = Omit<CriticalPoint, 'type'> & { hessian?: Hessian };
+
 export interface LimitData {
   xToInf: string;
   xToNegInf: string;
@@ -40,6 +84,33 @@ export interface AnalysisResult {
   properties: FunctionProperties;
 }
 
+// Analysis failures are routine while an equation is being typed
+const log = createLogger('mathAnalysis');
+
+// Function families used for type classification
+const TRIG_FUNCTIONS = ['sin', 'cos', 'tan', 'asin', 'acos', 'atan', 'sinh', 'cosh', 'tanh'];
+const LOG_FUNCTIONS = ['log', 'log10', 'log2'];
+
+// Functions whose singularities or jumps break continuity
+const POLE_FUNCTIONS = new Set(['tan', 'sec', 'csc', 'cot', 'log', 'log10', 'log2']);
+const STEP_FUNCTIONS = new Set(['floor', 'ceil', 'round', 'fix', 'sign', 'mod']);
+
+// Irregular sample points so the symmetry test is not fooled by roots at +/-1
+const SYMMETRY_SAMPLES = [0.37, 1, 1.61, 2.9];
+
+// Critical point search: gradient-magnitude grid for seeds, then Newton refinement
+const SEED_GRID_SIZE = 40;
+const MAX_SEEDS = 200;
+const MAX_CRITICAL_POINTS = 10;
+const NEWTON_ITERATIONS = 25;
+const GRADIENT_TOLERANCE = 1e-8;
+
+// Analysis results keyed by canonical expression string and domain
+const analysisCache = new LruCache<string, AnalysisResult>(256);
+
+// Symbolic partial derivatives keyed by canonical expression string
+const derivativeCache = new LruCache<string, DerivativeBundle>(256);
+
 export function analyzeExpression(
   parsedExpr: ParsedExpression,
   xMin: number,
@@ -47,68 +118,127 @@ export function analyzeExpression(
   yMin: number,
   yMax: number
 ): AnalysisResult {
-  const derivatives = calculateDerivatives(parsedExpr);
-  const criticalPoints = findCriticalPoints(parsedExpr, derivatives, xMin, xMax, yMin, yMax);
-  const limits = calculateLimits(parsedExpr);
-  const properties = analyzeProperties(parsedExpr);
-  
-  return {
+  // Invalid expressions share the fallback node, so never cache them
+  const cacheKey = parsedExpr.isValid
+    ? [parsedExpr.text, xMin, xMax, yMin, yMax].join('|')
+    : null;
+
+  if (cacheKey !== null) {
+    const cached = analysisCache.get(cacheKey);
+    if (cached) return cached;
+  }
+
+  const bundle = getDerivativeBundle(parsedExpr);
+  const derivatives = calculateDerivatives(bundle);
+  const criticalPoints = findCriticalPoints(parsedExpr, bundle, xMin, xMax, yMin, yMax);
+  const limits = calculateLimits();
+  const properties = analyzeProperties(parsedExpr, bundle);
+
+  const result: AnalysisResult = {
     derivatives,
     criticalPoints,
     limits,
     properties
   };
+
+  if (cacheKey !== null) {
+    analysisCache.set(cacheKey, result);
+  }
+
+  return result;
 }
 
-function calculateDerivatives(parsedExpr: ParsedExpression): DerivativeData {
-  const derivatives: DerivativeData = {};
-  
+function getDerivativeBundle(parsedExpr: ParsedExpression): DerivativeBundle {
+  if (!parsedExpr.isValid) return { text: {}, compiled: {} };
+
+  const cacheKey = parsedExpr.text;
+  const cached = derivativeCache.get(cacheKey);
+  if (cached) return cached;
+
+  const bundle: DerivativeBundle = { text: {}, compiled: {} };
+  bundle.polynomial = toPolynomial(parsedExpr.node, ['x', 'y']) ?? undefined;
+
   try {
-    if (!parsedExpr.isValid) return derivatives;
-    
-    const variables = parsedExpr.variables;
+    const hasX = parsedExpr.variables.includes('x');
+    const hasY = parsedExpr.variables.includes('y');
     
-    if (variables.includes('x')) {
+    if (hasX) {
       try {
         const fx = derivative(parsedExpr.node, 'x');
-        derivatives.fx = fx.toString();
+        bundle.fx = fx;
         
         // Second derivative with respect to x
-        const fxx = derivative(fx, 'x');
-        derivatives.fxx = fxx.toString();
+        bundle.fxx = derivative(fx, 'x');
         
         // Mixed partial if y is present
-        if (variables.includes('y')) {
-          const fxy = derivative(fx, 'y');
-          derivatives.fxy = fxy.toString();
+        if (hasY) {
+          bundle.fxy = derivative(fx, 'y');
         }
       } catch (error) {
-        console.warn('Error calculating x derivatives:', error);
+        log.debug('Error calculating x derivatives:', error);
       }
     }
     
-    if (variables.includes('y')) {
+    if (hasY) {
       try {
         const fy = derivative(parsedExpr.node, 'y');
-        derivatives.fy = fy.toString();
+        bundle.fy = fy;
         
         // Second derivative with respect to y
-        const fyy = derivative(fy, 'y');
-        derivatives.fyy = fyy.toString();
+        bundle.fyy = derivative(fy, 'y');
       } catch (error) {
-        console.warn('Error calculating y derivatives:', error);
+        log.debug('Error calculating y derivatives:', error);
       }
     }
   } catch (error) {
-    console.warn('General derivative calculation error:', error);
+    log.debug('General derivative calculation error:', error);
   }
-  
-  return derivatives;
+
+  try {
+    bundle.compiled.f = parsedExpr.compiled;
+    for (const name of ['fx', 'fy', 'fxx', 'fyy', 'fxy'] as const) {
+      const node = bundle[name];
+      if (!node) continue;
+      const text = node.toString();
+      bundle.text[name] = text;
+      bundle.compiled[name] = compileExpression(node, text);
+    }
+
+    const { fx, fy, fxx, fyy, fxy } = bundle;
+    if (fx && fy) {
+      const gradientAt = compileShared([fx, fy]);
+      bundle.gradientMagnitude = (x, y) => {
+        const [gx, gy] = gradientAt({ x, y });
+        // Math.hypot would coerce Complex values to 0 and fake a critical point
+        return typeof gx === 'number' && typeof gy === 'number' ? Math.hypot(gx, gy) : Infinity;
+      };
+    }
+    if (fx && fy && fxx && fyy && fxy) {
+      bundle.derivativesAt = compileShared([fx, fy, fxx, fyy, fxy]);
+
+      const isConstant = (node: MathNode) => !dependsOnVariables(node, parsedExpr.variables);
+      if ([fxx, fyy, fxy].every(isConstant)) {
+        const values = [fxx, fyy, fxy].map(node => node.compile().evaluate({}));
+        if (values.every(value => typeof value === 'number' && isFinite(value))) {
+          bundle.constantHessian = values as [number, number, number];
+        }
+      }
+    }
+  } catch (error) {
+    log.debug('Derivative compilation error:', error);
+  }
+
+  derivativeCache.set(cacheKey, bundle);
+  return bundle;
+}
+
+function calculateDerivatives(bundle: DerivativeBundle): DerivativeData {
+  return { ...bundle.text };
 }
 
 function findCriticalPoints(
   parsedExpr: ParsedExpression,
-  derivatives: DerivativeData,
+  bundle: DerivativeBundle,
   xMin: number,
   xMax: number,
   yMin: number,
@@ -117,80 +247,281 @@ function findCriticalPoints(
   const criticalPoints: CriticalPoint[] = [];
   
   try {
-    if (!parsedExpr.isValid || !derivatives.fx || !derivatives.fy) {
+    if (!parsedExpr.isValid) {
       return criticalPoints;
     }
     
-    // For now, use numerical method to find critical points
-    // This is a simplified approach - in a full implementation,
-    // you'd want to use a proper numerical solver
-    const step = 0.5;
-    const tolerance = 0.1;
-    
-    for (let x = xMin; x <= xMax; x += step) {
-      for (let y = yMin; y <= yMax; y += step) {
-        try {
-          const fxNode = parse(derivatives.fx);
-          const fyNode = parse(derivatives.fy);
-          
-          const fxVal = fxNode.evaluate({ x, y });
-          const fyVal = fyNode.evaluate({ x, y });
-          
-          // Check if both partial derivatives are close to zero
-          if (Math.abs(fxVal) < tolerance && Math.abs(fyVal) < tolerance) {
-            const z = evaluateExpression(parsedExpr, { x, y });
-            
-            if (isFinite(z)) {
-              const type = classifyCriticalPoint(derivatives, x, y);
-              criticalPoints.push({ x, y, z, type });
-            }
+    const variables = parsedExpr.variables;
+    const candidates = variables.length === 1 && variables[0] === 'x'
+      ? findUnivariateCandidates(bundle, xMin, xMax, yMin, yMax)
+      : findSurfaceCandidates(bundle, xMin, xMax, yMin, yMax);
+
+    // Classify the surviving candidates in one batch
+    const types = classifyCriticalPoints(bundle, candidates);
+    candidates.forEach(({ hessian, ...point }, index) => {
+      criticalPoints.push({ ...point, type: types[index] });
+    });
+  } catch (error) {
+    log.debug('Critical points calculation error:', error);
+  }
+  
+  return criticalPoints;
+}
+
+// Polynomials in x alone: critical points are the real roots of f'(x),
+// drawn on the y = 0 line (or the nearest domain edge)
+function findUnivariateCandidates(
+  bundle: DerivativeBundle,
+  xMin: number,
+  xMax: number,
+  yMin: number,
+  yMax: number
+): CandidatePoint[] {
+  const candidates: CandidatePoint[] = [];
+  const { f } = bundle.compiled;
+  const poly = bundle.polynomial;
+  if (!f || !poly) return candidates;
+
+  const coefficients = univariateCoefficients(poly, 0);
+  const slopeCoefficients = coefficients.slice(1).map((c, k) => (k + 1) * c);
+  const y = Math.min(Math.max(0, yMin), yMax);
+
+  for (const x of realPolynomialRoots(slopeCoefficients)) {
+    if (candidates.length >= MAX_CRITICAL_POINTS) break;
+    if (x < xMin || x > xMax) continue;
+
+    const z = f.evaluate({ x, y });
+    if (typeof z === 'number' && isFinite(z)) {
+      candidates.push({ x, y, z });
+    }
+  }
+
+  return candidates;
+}
+
+function findSurfaceCandidates(
+  bundle: DerivativeBundle,
+  xMin: number,
+  xMax: number,
+  yMin: number,
+  yMax: number
+): CandidatePoint[] {
+  const candidates: CandidatePoint[] = [];
+  const { f } = bundle.compiled;
+  const { gradientMagnitude } = bundle;
+  if (!f || !gradientMagnitude) {
+    return candidates;
+  }
+  
+  // Constant, nonsingular Hessian (quadratic surface): the single critical
+  // point is one Newton step from anywhere, so skip the seed grid
+  const hessian = bundle.constantHessian;
+  if (hessian && hessian[0] * hessian[1] - hessian[2] * hessian[2] !== 0) {
+    const point = refineCriticalPoint(bundle, (xMin + xMax) / 2, (yMin + yMax) / 2);
+    if (point && point.x >= xMin && point.x <= xMax && point.y >= yMin && point.y <= yMax) {
+      const z = f.evaluate({ x: point.x, y: point.y });
+      if (typeof z === 'number' && isFinite(z)) {
+        candidates.push({ ...point, z });
+      }
+    }
+    return candidates;
+  }
+  
+  // Sample the gradient magnitude on a coarse grid and keep its local
+  // minima as seeds for Newton's method
+  const n = SEED_GRID_SIZE;
+  const { x: xs, y: ys } = gridAxes(xMin, xMax, yMin, yMax, n);
+  const residual = new Float64Array(n * n);
+  
+  for (let i = 0; i < n; i++) {
+    for (let j = 0; j < n; j++) {
+      try {
+        const r = gradientMagnitude(xs[j], ys[i]);
+        residual[i * n + j] = typeof r === 'number' && isFinite(r) ? r : Infinity;
+      } catch (error) {
+        residual[i * n + j] = Infinity;
+      }
+    }
+  }
+  
+  const seeds: { x: number; y: number; r: number }[] = [];
+  for (let i = 0; i < n; i++) {
+    for (let j = 0; j < n; j++) {
+      const r = residual[i * n + j];
+      if (!isFinite(r)) continue;
+      
+      let isLocalMin = true;
+      for (let di = -1; di <= 1 && isLocalMin; di++) {
+        for (let dj = -1; dj <= 1; dj++) {
+          const ni = i + di;
+          const nj = j + dj;
+          if ((di || dj) && ni >= 0 && ni < n && nj >= 0 && nj < n && residual[ni * n + nj] < r) {
+            isLocalMin = false;
+            break;
           }
-        } catch (error) {
-          // Skip this point if evaluation fails
-          continue;
         }
       }
+      
+      if (isLocalMin) {
+        seeds.push({ x: xs[j], y: ys[i], r });
+      }
     }
-  } catch (error) {
-    console.warn('Critical points calculation error:', error);
   }
+  seeds.sort((a, b) => a.r - b.r);
   
-  return criticalPoints.slice(0, 10); // Limit to 10 points
+  const mergeDistance = 1e-4 * Math.max(xMax - xMin, yMax - yMin, 1);
+  // Snap accepted points to a hash grid so duplicate detection is O(1)
+  const occupied = new Set<string>();
+  const cellKey = (i: number, j: number) => `${i},${j}`;
+  
+  for (const seed of seeds.slice(0, MAX_SEEDS)) {
+    if (candidates.length >= MAX_CRITICAL_POINTS) break;
+    
+    const point = refineCriticalPoint(bundle, seed.x, seed.y);
+    if (!point) continue;
+    
+    const { x, y, hessian } = point;
+    if (x < xMin || x > xMax || y < yMin || y > yMax) continue;
+    
+    const ci = Math.round(x / mergeDistance);
+    const cj = Math.round(y / mergeDistance);
+    let isDuplicate = false;
+    for (let di = -1; di <= 1 && !isDuplicate; di++) {
+      for (let dj = -1; dj <= 1; dj++) {
+        if (occupied.has(cellKey(ci + di, cj + dj))) {
+          isDuplicate = true;
+          break;
+        }
+      }
+    }
+    if (isDuplicate) continue;
+    
+    try {
+      const z = f.evaluate({ x, y });
+      if (typeof z === 'number' && isFinite(z)) {
+        occupied.add(cellKey(ci, cj));
+        candidates.push({ x, y, z, hessian });
+      }
+    } catch (error) {
+      // Skip this point if evaluation fails
+      continue;
+    }
+  }
+
+  return candidates;
 }
 
-function classifyCriticalPoint(
-  derivatives: DerivativeData,
-  x: number,
-  y: number
-): 'minimum' | 'maximum' | 'saddle' | 'unknown' {
+// Newton's method on the gradient: solve H * step = -grad until grad vanishes
+function refineCriticalPoint(
+  bundle: DerivativeBundle,
+  x0: number,
+  y0: number
+): { x: number; y: number; hessian?: Hessian } | null {
+  const { fx, fy } = bundle.compiled;
+  const { derivativesAt } = bundle;
+  if (!fx || !fy) return null;
+  
+  let x = x0;
+  let y = y0;
+  
   try {
-    if (!derivatives.fxx || !derivatives.fyy || !derivatives.fxy) {
-      return 'unknown';
+    if (!derivativesAt) {
+      // Without a Hessian the seed itself has to be critical
+      const gx = fx.evaluate({ x, y });
+      const gy = fy.evaluate({ x, y });
+      if (!areReal([gx, gy])) return null;
+      return gx * gx + gy * gy < GRADIENT_TOLERANCE ? { x, y } : null;
     }
     
-    const fxxNode = parse(derivatives.fxx);
-    const fyyNode = parse(derivatives.fyy);
-    const fxyNode = parse(derivatives.fxy);
-    
-    const fxxVal = fxxNode.evaluate({ x, y });
-    const fyyVal = fyyNode.evaluate({ x, y });
-    const fxyVal = fxyNode.evaluate({ x, y });
-    
-    const discriminant = fxxVal * fyyVal - fxyVal * fxyVal;
-    
-    if (discriminant > 0) {
-      return fxxVal > 0 ? 'minimum' : 'maximum';
-    } else if (discriminant < 0) {
-      return 'saddle';
-    } else {
-      return 'unknown';
+    for (let iteration = 0; iteration <= NEWTON_ITERATIONS; iteration++) {
+      const values = derivativesAt({ x, y });
+      // Complex values coerce to 0 in arithmetic and would pass as critical
+      if (!areReal(values)) return null;
+      const [gx, gy, hxx, hyy, hxy] = values;
+      
+      if (gx * gx + gy * gy < GRADIENT_TOLERANCE) {
+        return { x, y, hessian: [hxx, hyy, hxy] };
+      }
+      if (iteration === NEWTON_ITERATIONS) {
+        return null;
+      }
+      
+      const det = hxx * hyy - hxy * hxy;
+      if (!isFinite(det) || Math.abs(det) < 1e-12) {
+        return null;
+      }
+      
+      x -= (hyy * gx - hxy * gy) / det;
+      y -= (hxx * gy - hxy * gx) / det;
+      if (!isFinite(x) || !isFinite(y)) {
+        return null;
+      }
     }
   } catch (error) {
+    // Derivatives undefined along the Newton path
+  }
+  
+  return null;
+}
+
+// mathjs returns Complex objects where an expression leaves the reals
+function areReal(values: unknown[]): values is number[] {
+  return values.every(value => typeof value === 'number');
+}
+
+function classifyCriticalPoints(
+  bundle: DerivativeBundle,
+  points: CandidatePoint[]
+): CriticalPoint['type'][] {
+  if (points.length === 0) return [];
+
+  const { fxx, fyy, fxy } = bundle.compiled;
+
+  // Functions of x alone: second derivative test
+  if (fxx && !fyy && !fxy) {
+    return points.map(({ x, y }): CriticalPoint['type'] => {
+      try {
+        const fxxVal = fxx.evaluate({ x, y });
+        return fxxVal > 0 ? 'minimum' : fxxVal < 0 ? 'maximum' : 'unknown';
+      } catch (error) {
+        return 'unknown';
+      }
+    });
+  }
+
+  // The same Hessian everywhere means the same classification everywhere
+  if (bundle.constantHessian) {
+    const type = hessianType(...bundle.constantHessian);
+    return points.map(() => type);
+  }
+
+  const { derivativesAt } = bundle;
+
+  return points.map(({ x, y, hessian }): CriticalPoint['type'] => {
+    if (hessian) return hessianType(...hessian);
+    if (!derivativesAt) return 'unknown';
+    try {
+      const [, , fxxVal, fyyVal, fxyVal] = derivativesAt({ x, y });
+      return hessianType(fxxVal, fyyVal, fxyVal);
+    } catch (error) {
+      return 'unknown';
+    }
+  });
+}
+
+function hessianType(fxxVal: number, fyyVal: number, fxyVal: number): CriticalPoint['type'] {
+  const discriminant = fxxVal * fyyVal - fxyVal * fxyVal;
+  
+  if (discriminant > 0) {
+    return fxxVal > 0 ? 'minimum' : 'maximum';
+  } else if (discriminant < 0) {
+    return 'saddle';
+  } else {
     return 'unknown';
   }
 }
 
-function calculateLimits(_parsedExpr: ParsedExpression): LimitData {
+function calculateLimits(): LimitData {
   // Simplified limit analysis - in a full implementation,
   // you'd use more sophisticated limit calculation
   return {
@@ -202,33 +533,57 @@ function calculateLimits(_parsedExpr: ParsedExpression): LimitData {
   };
 }
 
-function analyzeProperties(parsedExpr: ParsedExpression): FunctionProperties {
+function analyzeProperties(parsedExpr: ParsedExpression, bundle: DerivativeBundle): FunctionProperties {
   const variables = parsedExpr.variables;
-  const exprString = parsedExpr.node.toString();
+  const hasX = variables.includes('x');
+  const hasY = variables.includes('y');
+  const functions = collectSymbolNames(parsedExpr.node);
+  
+  const poly = bundle.polynomial;
+  const totalDegrees = poly ? polynomialTerms(poly).map(term => term.exponents[0] + term.exponents[1]) : [];
   
   // Basic type classification
   let type = 'General';
-  if (exprString.includes('sin') || exprString.includes('cos') || exprString.includes('tan')) {
+  if (poly) {
+    type = `Polynomial (degree ${Math.max(0, ...totalDegrees)})`;
+  } else if (TRIG_FUNCTIONS.some(name => functions.has(name))) {
     type = 'Trigonometric';
-  } else if (exprString.includes('exp')) {
+  } else if (functions.has('exp')) {
     type = 'Exponential';
-  } else if (exprString.includes('log')) {
+  } else if (LOG_FUNCTIONS.some(name => functions.has(name))) {
     type = 'Logarithmic';
-  } else if (/^[\d\s+\-*/^xy()]+$/.test(exprString.replace(/\s/g, ''))) {
-    type = 'Polynomial';
   }
   
   // Basic symmetry check
   let symmetry = 'No obvious symmetry';
+  const { f } = bundle.compiled;
   try {
-    if (variables.includes('x') && !variables.includes('y')) {
-      // Test for even/odd function
-      const testVal = evaluateExpression(parsedExpr, { x: 1 });
-      const testNegVal = evaluateExpression(parsedExpr, { x: -1 });
+    if (poly && poly.size > 0 && (hasX || hasY)) {
+      // Exact for polynomials: f(-x, -y) = +/-f(x, y) exactly when every
+      // term has even (or every term odd) total degree
+      const [mirrored, original] = hasY ? (hasX ? ['-x, -y', 'x, y'] : ['-y', 'y']) : ['-x', 'x'];
+      if (totalDegrees.every(degree => degree % 2 === 0)) {
+        symmetry = `Even function (f(${mirrored}) = f(${original}))`;
+      } else if (totalDegrees.every(degree => degree % 2 === 1)) {
+        symmetry = `Odd function (f(${mirrored}) = -f(${original}))`;
+      }
+    } else if (f && hasX && !hasY) {
+      // Test for even/odd function at several points in one pass, reusing
+      // the compiled expression from the derivative bundle
+      let isEven = true;
+      let isOdd = true;
+      for (const x of SYMMETRY_SAMPLES) {
+        const value = f.evaluate({ x });
+        const mirrored = f.evaluate({ x: -x });
+        const tolerance = 1e-10 * Math.max(1, Math.abs(value));
+        isEven = isEven && Math.abs(value - mirrored) < tolerance;
+        isOdd = isOdd && Math.abs(value + mirrored) < tolerance;
+        if (!isEven && !isOdd) break;
+      }
       
-      if (Math.abs(testVal - testNegVal) < 1e-10) {
+      if (isEven) {
         symmetry = 'Even function (f(-x) = f(x))';
-      } else if (Math.abs(testVal + testNegVal) < 1e-10) {
+      } else if (isOdd) {
         symmetry = 'Odd function (f(-x) = -f(x))';
       }
     }
@@ -241,7 +596,89 @@ function analyzeProperties(parsedExpr: ParsedExpression): FunctionProperties {
     variables,
     dimension: variables.length,
     symmetry,
-    continuity: 'Continuous (assumed)',
+    continuity: analyzeContinuity(parsedExpr),
     domain: 'Real numbers (assumed)'
   };
+}
+
+// Function names are visited as SymbolNodes too, so one traversal
+// yields every identifier in the expression
+function collectSymbolNames(node: MathNode): Set<string> {
+  const names = new Set<string>();
+
+  node.traverse((child) => {
+    if (isSymbolNode(child)) {
+      names.add(child.name);
+    }
+  });
+
+  return names;
+}
+
+function dependsOnVariables(node: MathNode, variables: string[]): boolean {
+  return node.filter(child => isSymbolNode(child) && variables.includes(child.name)).length > 0;
+}
+
+// Which subtrees involve the variables, computed bottom-up in one pass
+function variableDependence(root: MathNode, variables: string[]): Map<MathNode, boolean> {
+  const dependence = new Map<MathNode, boolean>();
+
+  const visit = (node: MathNode): boolean => {
+    let depends = isSymbolNode(node) && variables.includes(node.name);
+    node.forEach((child) => {
+      if (visit(child)) depends = true;
+    });
+    dependence.set(node, depends);
+    return depends;
+  };
+
+  visit(root);
+  return dependence;
+}
+
+// Look for denominators, negative powers, and singular functions whose
+// arguments involve the variables
+function analyzeContinuity(parsedExpr: ParsedExpression): string {
+  const dependence = variableDependence(parsedExpr.node, parsedExpr.variables);
+  const depends = (node: MathNode) => dependence.get(node) === true;
+  const reasons = new Set<string>();
+
+  // Walk only subtrees that involve the variables; the rest cannot
+  // introduce discontinuities, so they are never descended into
+  const visit = (child: MathNode): void => {
+    if (!depends(child)) return;
+
+    if (isOperatorNode(child)) {
+      if (child.fn === 'divide' && depends(child.args[1])) {
+        reasons.add('denominator can vanish');
+      } else if (child.fn === 'mod') {
+        reasons.add('jumps in mod');
+      } else if (child.fn === 'pow' && depends(child.args[0])) {
+        try {
+          const exponent = child.args[1].compile().evaluate({});
+          if (typeof exponent === 'number' && exponent < 0) {
+            reasons.add('denominator can vanish');
+          }
+        } catch (error) {
+          // Exponent depends on the variables; leave it to the other checks
+        }
+      }
+    } else if (isFunctionNode(child) && child.args.some(depends)) {
+      const name = child.fn.name;
+      if (POLE_FUNCTIONS.has(name)) {
+        reasons.add(`singularities of ${name}`);
+      } else if (STEP_FUNCTIONS.has(name)) {
+        reasons.add(`jumps in ${name}`);
+      }
+    }
+
+    child.forEach(visit);
+  };
+
+  visit(parsedExpr.node);
+
+  if (reasons.size === 0) {
+    return 'Continuous on its domain';
+  }
+  return `Possible discontinuities (${Array.from(reasons).join(', ')})`;
 }
\ No newline at end of file
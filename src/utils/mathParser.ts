@@ -1,13 +1,90 @@
-import { parse, MathNode } from 'mathjs';
+import { parse, EvalFunction, MathNode } from 'mathjs';
+import { compileWithCse } from './cse';
+import { gridAxes } from './grid';
+import { compileSurfaceKernel } from './jit';
+import { LruCache } from './lruCache';
+
+const SINGLE_LETTER = /^[a-zA-Z]$/;
+
+// Identifiers that are never treated as free variables
+const RESERVED_NAMES = new Set([
+  'pi', 'e', 'sin', 'cos', 'tan', 'log', 'sqrt', 'exp', 'abs',
+  'asin', 'acos', 'atan', 'sinh', 'cosh', 'tanh'
+]);
+
+// Typeset symbols and their mathjs spellings, rewritten in a single pass
+const NOTATION = new Map([
+  ['×', '*'],    // Multiplication
+  ['÷', '/'],    // Division
+  ['−', '-'],    // Minus
+  ['π', 'pi'],   // Pi
+  ['√', 'sqrt']  // Square root
+]);
+const NOTATION_PATTERN = /[×÷−π√]/g;
+
+// Inverse-trig and logarithm spellings, rewritten in a single pass
+const FUNCTION_RENAMES = new Map([
+  ['sin⁻¹', 'asin'],
+  ['cos⁻¹', 'acos'],
+  ['tan⁻¹', 'atan'],
+  ['ln', 'log']
+]);
+const FUNCTION_RENAME_PATTERN = /sin⁻¹|cos⁻¹|tan⁻¹|ln/g;
+
+// Explicit operators keep the usual precedence: mathjs would bind implicit
+// products tighter than division (x/2y as x/(2y)). A letter is only split
+// off when it stands alone, so names like sin( or log10 stay intact, but
+// a lone letter or pi before a parenthesis is a product, not a call
+const IMPLICIT_MULTIPLICATION: [RegExp, string][] = [
+  [/(\d)([a-zA-Z])/g, '$1*$2'],                   // 2x -> 2*x
+  [/(?<![a-zA-Z])([a-zA-Z])(?=\d)/g, '$1*'],       // x2 -> x*2
+  [/\)([a-zA-Z(])/g, ')*$1'],                     // )(x -> )*(x
+  [/(?<![a-zA-Z])(pi|[a-zA-Z])(?=\()/g, '$1*']     // x( -> x*(
+];
+
+// Points where a freshly parsed expression is test-evaluated
+const TEST_POINTS = [[0, 0], [1, 1], [-1, -1], [0.5, 0.5]];
 
 export interface ParsedExpression {
   node: MathNode;
+  // Normalized expression text, printed once and reused as a cache key
+  text: string;
+  // Compiled once at parse time and shared by every numeric consumer
+  compiled: EvalFunction;
   variables: string[];
   isValid: boolean;
   errorMessage?: string;
 }
 
+// Parsed (and compiled) expressions keyed by the raw equation text; cached
+// entries are frozen because they are shared across renders
+const parseCache = new LruCache<string, ParsedExpression>(256);
+
+// Compiled evaluators keyed by the normalized expression text, so equations
+// that differ only in notation (and repeated derivatives) compile once.
+// Repeated subtrees are evaluated once per call via common subexpression
+// elimination, which matters most on the per-point mesh loop
+const compileCache = new LruCache<string, EvalFunction>(256);
+
+export function compileExpression(node: MathNode, key = node.toString()): EvalFunction {
+  const cached = compileCache.get(key);
+  if (cached) return cached;
+
+  const compiled = compileWithCse(node);
+  compileCache.set(key, compiled);
+  return compiled;
+}
+
 export function parseMathExpression(equation: string): ParsedExpression {
+  const cached = parseCache.get(equation);
+  if (cached) return cached;
+
+  const parsed = Object.freeze(parseUncached(equation));
+  parseCache.set(equation, parsed);
+  return parsed;
+}
+
+function parseUncached(equation: string): ParsedExpression {
   try {
     // Clean the equation string
     let cleanEquation = equation.trim();
@@ -29,39 +106,37 @@ export function parseMathExpression(equation: string): ParsedExpression {
     
     // Replace common mathematical notation
     cleanEquation = cleanEquation
-      .replace(/\^/g, '^')  // Power
-      .replace(/×/g, '*')   // Multiplication
-      .replace(/÷/g, '/')   // Division
-      .replace(/−/g, '-')   // Minus
-      .replace(/π/g, 'pi')  // Pi
-      .replace(/sin⁻¹/g, 'asin')
-      .replace(/cos⁻¹/g, 'acos')
-      .replace(/tan⁻¹/g, 'atan')
-      .replace(/ln/g, 'log')
-      .replace(/√/g, 'sqrt');
+      .replace(NOTATION_PATTERN, (match) => NOTATION.get(match) as string)
+      .replace(FUNCTION_RENAME_PATTERN, (match) => FUNCTION_RENAMES.get(match) as string);
     
     // Handle implicit multiplication
-    cleanEquation = cleanEquation
-      .replace(/(\d)([a-zA-Z])/g, '$1*$2')  // 2x -> 2*x
-      .replace(/([a-zA-Z])(\d)/g, '$1*$2')  // x2 -> x*2
-      .replace(/\)([a-zA-Z(])/g, ')*$1')    // )(x -> )*(x
-      .replace(/([a-zA-Z])\(/g, '$1*(');    // x( -> x*(
+    for (const [pattern, replacement] of IMPLICIT_MULTIPLICATION) {
+      cleanEquation = cleanEquation.replace(pattern, replacement);
+    }
     
     // Parse the expression
     const node = parse(cleanEquation);
     
     // Extract variables
     const variables = extractVariables(node);
+    const text = node.toString();
+    const compiled = compileExpression(node, text);
+    validateAtTestPoints(compiled, variables);
     
     return {
       node,
+      text,
+      compiled,
       variables,
       isValid: true
     };
     
   } catch (error) {
+    const fallback = parse('0');
     return {
-      node: parse('0'), // fallback
+      node: fallback,
+      text: '0',
+      compiled: compileExpression(fallback, '0'),
       variables: [],
       isValid: false,
       errorMessage: error instanceof Error ? error.message : 'Unknown parsing error'
@@ -75,11 +150,9 @@ function extractVariables(node: MathNode): string[] {
   node.traverse((node) => {
     if (node.type === 'SymbolNode') {
       const name = (node as any).name;
-      // Only include single-letter variables and common math variables
-      if (/^[a-zA-Z]$/.test(name) || ['pi', 'e'].includes(name)) {
-        if (!['pi', 'e', 'sin', 'cos', 'tan', 'log', 'sqrt', 'exp', 'abs', 'asin', 'acos', 'atan', 'sinh', 'cosh', 'tanh'].includes(name)) {
-          variables.add(name);
-        }
+      // Only include single-letter variables, excluding constants and functions
+      if (SINGLE_LETTER.test(name) && !RESERVED_NAMES.has(name)) {
+        variables.add(name);
       }
     }
   });
@@ -87,53 +160,88 @@ function extractVariables(node: MathNode): string[] {
   return Array.from(variables).sort();
 }
 
-export function evaluateExpression(
-  parsedExpr: ParsedExpression, 
-  variables: Record<string, number>
-): number {
-  try {
-    if (!parsedExpr.isValid) {
-      return NaN;
-    }
+// Parsing accepts things that can never be evaluated (unknown functions,
+// wrong argument counts), so require at least one test point to evaluate
+// without throwing; the last error becomes the parse error
+function validateAtTestPoints(compiled: EvalFunction, variables: string[]): void {
+  let lastError: unknown;
+  
+  for (const point of TEST_POINTS) {
+    const scope: Record<string, number> = {};
+    variables.forEach((name, index) => {
+      scope[name] = point[Math.min(index, point.length - 1)];
+    });
     
-    const result = parsedExpr.node.evaluate(variables);
-    return typeof result === 'number' ? result : NaN;
-  } catch (error) {
-    return NaN;
+    try {
+      compiled.evaluate(scope);
+      return;
+    } catch (error) {
+      lastError = error;
+    }
   }
+  
+  throw lastError;
 }
 
+export type MeshPrecision = 'float32' | 'float64';
+
 export function createMeshData(
   parsedExpr: ParsedExpression,
   xMin: number,
   xMax: number,
   yMin: number,
   yMax: number,
-  resolution: number
-): { x: number[][], y: number[][], z: (number | null)[][] } {
-  const x: number[][] = [];
-  const y: number[][] = [];
-  const z: (number | null)[][] = [];
+  resolution: number,
+  precision: MeshPrecision = 'float32'
+): { x: readonly number[], y: readonly number[], z: (Float32Array | Float64Array)[] } {
+  // Plotly accepts 1-D axes for surfaces and contours, so only z is a full
+  // grid: z[i][j] is the value at (x[j], y[i]). WebGL renders in single
+  // precision anyway, so rows default to Float32Array; NaN marks a gap
+  const { x, y } = gridAxes(xMin, xMax, yMin, yMax, resolution);
+  const z: (Float32Array | Float64Array)[] = [];
+  
+  // Without y every row is identical: evaluate one and share it
+  const dependsOnY = parsedExpr.variables.includes('y');
+  
+  // One contiguous allocation; rows are views into it
+  const size = (dependsOnY ? resolution : 1) * resolution;
+  const buffer = precision === 'float64' ? new Float64Array(size) : new Float32Array(size);
   
-  const xStep = (xMax - xMin) / (resolution - 1);
-  const yStep = (yMax - yMin) / (resolution - 1);
+  const sample = createSampler(parsedExpr);
   
   for (let i = 0; i < resolution; i++) {
-    x[i] = [];
-    y[i] = [];
-    z[i] = [];
+    if (i > 0 && !dependsOnY) {
+      z[i] = z[0];
+      continue;
+    }
+    
+    const yVal = y[i];
+    const row = buffer.subarray(i * resolution, (i + 1) * resolution);
+    z[i] = row;
     
+    // Store, then check the stored value: v - v is 0 only for finite v, so
+    // this one comparison also catches doubles that overflow float32
     for (let j = 0; j < resolution; j++) {
-      const xVal = xMin + j * xStep;
-      const yVal = yMin + i * yStep;
-      
-      x[i][j] = xVal;
-      y[i][j] = yVal;
-      
-      const zVal = evaluateExpression(parsedExpr, { x: xVal, y: yVal });
-      z[i][j] = isFinite(zVal) ? zVal : null;
+      row[j] = sample(x[j], yVal);
+      const v = row[j];
+      if (v - v !== 0) row[j] = NaN;
     }
   }
   
   return { x, y, z };
-}
\ No newline at end of file
+}
+// Native kernel when the expression allows one, otherwise the compiled
+// mathjs evaluator with undefined points reported as NaN
+function createSampler(parsedExpr: ParsedExpression): (x: number, y: number) => number {
+  const { compiled } = parsedExpr;
+  
+  return compileSurfaceKernel(parsedExpr.node, parsedExpr.text) ?? ((x: number, y: number) => {
+    try {
+      const result = compiled.evaluate({ x, y });
+      return typeof result === 'number' ? result : NaN;
+    } catch (error) {
+      // Leave a gap where the expression is undefined
+      return NaN;
+    }
+  });
+}
@@ -0,0 +1,230 @@
+import { eigs, isConstantNode, isOperatorNode, isParenthesisNode, isSymbolNode, MathNode } from 'mathjs';
+
+// Sparse polynomial: comma-joined exponent tuple -> coefficient
+export type Polynomial = Map<string, number>;
+
+// Larger powers are not expanded symbolically
+const MAX_EXPONENT = 32;
+
+// Expansion runs synchronously on the render path, so anything whose
+// product would exceed these bounds is treated as non-polynomial
+const MAX_TOTAL_DEGREE = 32;
+const MAX_TERMS = 256;
+
+export function toPolynomial(node: MathNode, variables: string[]): Polynomial | null {
+  try {
+    return convert(node, variables);
+  } catch (error) {
+    return null;
+  }
+}
+
+export function polynomialTerms(poly: Polynomial): { exponents: number[]; coefficient: number }[] {
+  return Array.from(poly, ([key, coefficient]) => ({
+    exponents: parseKey(key),
+    coefficient
+  }));
+}
+
+// Coefficients in ascending order of one variable's exponent; meaningful
+// when the polynomial does not involve the other variables
+export function univariateCoefficients(poly: Polynomial, index = 0): number[] {
+  const coefficients: number[] = [];
+
+  poly.forEach((coefficient, key) => {
+    const degree = parseKey(key)[index];
+    while (coefficients.length <= degree) coefficients.push(0);
+    coefficients[degree] += coefficient;
+  });
+
+  return coefficients;
+}
+
+export function realPolynomialRoots(coefficients: number[]): number[] {
+  const c = coefficients.slice();
+  while (c.length > 0 && c[c.length - 1] === 0) c.pop();
+
+  const degree = c.length - 1;
+  if (degree < 1) return [];
+  if (degree === 1) return [-c[0] / c[1]];
+
+  // Eigenvalues of the companion matrix of the monic polynomial
+  const companion: number[][] = [];
+  for (let i = 0; i < degree; i++) {
+    const row = new Array<number>(degree).fill(0);
+    if (i > 0) row[i - 1] = 1;
+    row[degree - 1] = -c[i] / c[degree];
+    companion.push(row);
+  }
+
+  const { values } = eigs(companion, { eigenvectors: false });
+  const roots: number[] = [];
+
+  for (const value of values as unknown as (number | { re: number; im: number })[]) {
+    const re = typeof value === 'number' ? value : value.re;
+    const im = typeof value === 'number' ? 0 : value.im;
+    if (Math.abs(im) > 1e-6 * Math.max(1, Math.abs(re))) continue;
+
+    const root = polishRoot(c, re);
+    if (!roots.some(r => Math.abs(r - root) < 1e-9 * Math.max(1, Math.abs(root)))) {
+      roots.push(root);
+    }
+  }
+
+  return roots.sort((a, b) => a - b);
+}
+
+// A few Newton steps on the original coefficients to undo eigenvalue round-off
+function polishRoot(coefficients: number[], x0: number): number {
+  let x = x0;
+
+  for (let iteration = 0; iteration < 3; iteration++) {
+    let value = 0;
+    let slope = 0;
+    for (let k = coefficients.length - 1; k >= 0; k--) {
+      slope = slope * x + value;
+      value = value * x + coefficients[k];
+    }
+    if (slope === 0 || !isFinite(value / slope)) break;
+    x -= value / slope;
+  }
+
+  return isFinite(x) ? x : x0;
+}
+
+function convert(node: MathNode, variables: string[]): Polynomial | null {
+  if (isParenthesisNode(node)) {
+    return convert(node.content, variables);
+  }
+
+  if (isConstantNode(node)) {
+    return typeof node.value === 'number' ? constant(node.value, variables.length) : null;
+  }
+
+  if (isSymbolNode(node)) {
+    const index = variables.indexOf(node.name);
+    if (index >= 0) {
+      const exponents = new Array<number>(variables.length).fill(0);
+      exponents[index] = 1;
+      return new Map([[exponents.join(','), 1]]);
+    }
+    if (node.name === 'pi') return constant(Math.PI, variables.length);
+    if (node.name === 'e') return constant(Math.E, variables.length);
+    return null;
+  }
+
+  if (!isOperatorNode(node)) {
+    return null;
+  }
+
+  const operands: Polynomial[] = [];
+  for (const arg of node.args) {
+    const converted = convert(arg, variables);
+    if (!converted) return null;
+    operands.push(converted);
+  }
+
+  switch (node.fn) {
+    case 'unaryPlus':
+      return operands[0];
+    case 'unaryMinus':
+      return scale(operands[0], -1);
+    case 'add':
+      return operands.reduce((sum, p) => add(sum, p));
+    case 'subtract':
+      return add(operands[0], scale(operands[1], -1));
+    case 'multiply': {
+      let product: Polynomial | null = operands[0];
+      for (let i = 1; i < operands.length && product; i++) {
+        product = multiply(product, operands[i]);
+      }
+      return product;
+    }
+    case 'divide': {
+      const divisor = constantValue(operands[1]);
+      return divisor === null || divisor === 0 ? null : scale(operands[0], 1 / divisor);
+    }
+    case 'pow': {
+      const exponent = constantValue(operands[1]);
+      if (exponent === null || !Number.isInteger(exponent) || exponent < 0 || exponent > MAX_EXPONENT) {
+        return null;
+      }
+      let result: Polynomial | null = constant(1, variables.length);
+      for (let i = 0; i < exponent && result; i++) {
+        result = multiply(result, operands[0]);
+      }
+      return result;
+    }
+    default:
+      return null;
+  }
+}
+
+function constant(value: number, variableCount: number): Polynomial {
+  const key = new Array<number>(variableCount).fill(0).join(',');
+  return value === 0 ? new Map() : new Map([[key, value]]);
+}
+
+function constantValue(poly: Polynomial): number | null {
+  if (poly.size === 0) return 0;
+  if (poly.size > 1) return null;
+
+  const [key, value] = poly.entries().next().value as [string, number];
+  return parseKey(key).every(exponent => exponent === 0) ? value : null;
+}
+
+function add(p: Polynomial, q: Polynomial): Polynomial {
+  const result = new Map(p);
+  q.forEach((coefficient, key) => {
+    const sum = (result.get(key) ?? 0) + coefficient;
+    if (sum === 0) {
+      result.delete(key);
+    } else {
+      result.set(key, sum);
+    }
+  });
+  return result;
+}
+
+function scale(p: Polynomial, factor: number): Polynomial {
+  const result: Polynomial = new Map();
+  if (factor === 0) return result;
+  p.forEach((coefficient, key) => result.set(key, coefficient * factor));
+  return result;
+}
+
+// Null when the product would exceed MAX_TERMS or MAX_TOTAL_DEGREE; both
+// bounds are checked before any term pair is expanded
+function multiply(p: Polynomial, q: Polynomial): Polynomial | null {
+  if (p.size * q.size > MAX_TERMS || totalDegree(p) + totalDegree(q) > MAX_TOTAL_DEGREE) {
+    return null;
+  }
+
+  const result: Polynomial = new Map();
+  p.forEach((a, keyA) => {
+    const expA = parseKey(keyA);
+    q.forEach((b, keyB) => {
+      const expB = parseKey(keyB);
+      const key = expA.map((e, i) => e + expB[i]).join(',');
+      const sum = (result.get(key) ?? 0) + a * b;
+      if (sum === 0) {
+        result.delete(key);
+      } else {
+        result.set(key, sum);
+      }
+    });
+  });
+  return result;
+}
+
+function totalDegree(poly: Polynomial): number {
+  let degree = 0;
+  poly.forEach((_, key) => {
+    degree = Math.max(degree, parseKey(key).reduce((sum, exponent) => sum + exponent, 0));
+  });
+  return degree;
+}
+
+function parseKey(key: string): number[] {
+  return key === '' ? [] : key.split(',').map(Number);
+}